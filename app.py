@@ -3,6 +3,8 @@ YouTrack Export Console Application
 Main entry point for the application.
 """
 import sys
+import threading
+from concurrent.futures import Future
 
 import questionary
 from rich import print
@@ -12,7 +14,6 @@ from rich.table import Table
 
 from src.youtrack_export.client import YouTrackClient
 from src.youtrack_export.exceptions import AuthenticationError, YouTrackError
-from src.youtrack_export.export import Export
 
 console = Console()
 
@@ -27,9 +28,11 @@ def main():
         console.print('Initializing YouTrack client...', style='dim')
         client = YouTrackClient()
 
-        # Get current user
-        user = client.get_current_user()
-        print(f'[bold]Connected as:[/bold] [green]{user.get('name', 'Unknown')}[/green]')
+        # Get current user in the background so the menu renders immediately,
+        # on a daemon thread so exiting never waits on an unresponsive server
+        user_future: Future = Future()
+        threading.Thread(target=fetch_current_user, args=(client, user_future), daemon=True).start()
+        connected = False
 
         while True:
             console.print(Markdown('***'))
@@ -41,6 +44,11 @@ def main():
                     '3. Exit'
                 ]).ask()
 
+            # the menu itself doesn't need the connection, wait for it only when an action does
+            if action and action.startswith(('1', '2')) and not connected:
+                wait_for_connection(user_future)
+                connected = True
+
             if action and action.startswith('1'):
                 list_projects(client)
             elif action and action.startswith('2'):
@@ -66,6 +74,31 @@ def main():
         sys.exit(1)
 
 
+def fetch_current_user(client: YouTrackClient, user_future: Future) -> None:
+    """
+    Fetch the current user and resolve the future with the result or the error.
+    Args:
+        client (YouTrackClient): YouTrackClient instance.
+        user_future (Future): Future to resolve with the current user information.
+    """
+    try:
+        user_future.set_result(client.get_current_user())
+    except Exception as e:
+        user_future.set_exception(e)
+
+
+def wait_for_connection(user_future: Future) -> None:
+    """
+    Wait for the background connection to YouTrack and show the connected user.
+    Args:
+        user_future (Future): Future resolving to the current user information.
+    """
+    with console.status('Connecting to YouTrack...'):
+        user = user_future.result()
+
+    print(f'[bold]Connected as:[/bold] [green]{user.get('name', 'Unknown')}[/green]')
+
+
 def list_projects(client: YouTrackClient) -> None:
     """
     List all the current user's projects in a table.
@@ -110,15 +143,17 @@ def init_export_projects(client: YouTrackClient) -> None:
     if not action or action.startswith('<<'):
         return
 
-    projects: list[str] = [f'{p.get('name')} | ID:{p.get('id')}' for p in client.get_projects() if p.get('archived') is not True]
+    # Map each choice label to its project, don't list archived projects since we can't get all data from the API.
+    labels: dict[str, dict] = {f'{p.get('name')} | ID:{p.get('id')}': p for p in client.get_projects() if p.get('archived') is not True}
+    projects: list[dict] = list(labels.values())
     if action.startswith('2'):
-        # User selects the projects and the id is parsed out of the selected strings.
-        # Don't list archived projects in the choices since we can't get all data from the API.
-        projects: list[str] = questionary.checkbox(
+        # User selects the projects and the selected labels are resolved back to their projects.
+        selected: list[str] = questionary.checkbox(
             'Select the projects would you like to export:',
-            choices=projects,
+            choices=list(labels.keys()),
             qmark='✔️'
         ).ask()
+        projects = [labels[label] for label in selected]
 
     if len(projects) == 0:
         console.print('No projects were selected.', style='red')
@@ -140,7 +175,8 @@ def init_export_projects(client: YouTrackClient) -> None:
         console.print('No export items were selected.', style='red')
         return
 
-    # Send selected projects and export items to an export class.
+    # Send selected projects and export items to an export class, only imported once an export actually runs.
+    from src.youtrack_export.export import Export
     Export(client, projects, export_items)
 
 
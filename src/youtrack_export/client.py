@@ -2,10 +2,19 @@
 YouTrack API Client
 Provides convenient access to the YouTrack REST API.
 """
-from typing import Optional, Dict
+import asyncio
+import functools
+import random
+import urllib.parse
+from typing import AsyncIterator, Optional, Dict
 
+import aiofiles
 import aiohttp
+import orjson
 import requests
+from yarl import URL
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from .config import ConfigManager
 from .exceptions import AuthenticationError
@@ -14,6 +23,8 @@ from .exceptions import AuthenticationError
 class YouTrackClient:
     """Client for interacting with YouTrack REST API."""
     __user: Optional[Dict] = None
+    __retry_attempts: int = 5
+    __retry_statuses: tuple[int, ...] = (429, 500, 502, 503, 504)
 
     def __init__(self, base_url: Optional[str] = None, token: Optional[str] = None):
         """
@@ -33,77 +44,122 @@ class YouTrackClient:
         if not self.base_url or not self.token:
             raise AuthenticationError('YouTrack URL and token are required')
 
-        # Setup session
+        # Setup session with a larger keep-alive pool and retries for transient errors
         self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], respect_retry_after_header=True)
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.headers = {
             'Authorization': f'Bearer {self.token}',
             'Content-Type': 'application/json',
-            'Accept': 'application/json'
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate'
         }
         self.session.headers.update(self.headers)
 
-        # Validate connection
-        self._validate_connection()
+        # Endpoint urls, built once instead of on every request
+        self._url_me = f'{self.base_url}/api/users/me?fields=id,login,name,email'
+        self._url_projects = f'{self.base_url}/api/admin/projects?fields=id,name,description,archived'
+        self._url_issues = f'{self.base_url}/api/issues'
+        self._url_count = f'{self.base_url}/api/issuesGetter/count?fields=count'
 
-    def _validate_connection(self) -> None:
-        """Validate the connection to YouTrack."""
-        try:
-            response = self.session.get(f'{self.base_url}/api/users/me')
-            response.raise_for_status()
-        except requests.RequestException as e:
-            raise AuthenticationError(f'Failed to connect to YouTrack: {e}')
+        # Projects pages fetched during this session, keyed by (limit, skip)
+        self._projects_cache: dict[tuple[int, int], list] = {}
+
+        # Long-lived async session, opened by entering the client with `async with`
+        self._aio: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> 'YouTrackClient':
+        """
+        Open the async session shared by every async request of the client.
+        Returns:
+            YouTrackClient: The client instance.
+        """
+        if self._aio is None or self._aio.closed:
+            self._aio = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, limit_per_host=20, ttl_dns_cache=300, keepalive_timeout=60),
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=120, connect=10),
+                json_serialize=lambda obj: orjson.dumps(obj).decode()
+            )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Close the async session when leaving the `async with` block."""
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the async session."""
+        if self._aio is not None:
+            await self._aio.close()
+            self._aio = None
 
     def get_current_user(self) -> Dict:
         """
-        Get information about the current user.
+        Get information about the current user, which also validates the connection to YouTrack.
         Returns:
             Dict: Current user information
+        Raises:
+            AuthenticationError: If the connection to YouTrack fails.
         """
         if self.__user:
             return self.__user
 
-        response = self.session.get(f'{self.base_url}/api/users/me?fields=id,login,name,email')
-        response.raise_for_status()
+        try:
+            response = self.session.get(self._url_me, timeout=15)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise AuthenticationError(f'Failed to connect to YouTrack: {e}')
+
         self.__user = response.json()
         return self.__user
 
     def get_projects(self, limit: int = 100, skip: int = 0) -> list:
         """
-        Get all projects.
+        Get all projects, cached for the session until invalidate_projects is called.
         Args:
             limit (int): Number of projects to return.
             skip (int): Number of projects to skip.
         Returns:
             list: List of projects.
         """
-        response = self.session.get(f'{self.base_url}/api/admin/projects?fields=id,name,description,archived&$top={limit}&$skip={skip}')
+        if (limit, skip) in self._projects_cache:
+            return self._projects_cache[(limit, skip)]
+
+        response = self.session.get(f'{self._url_projects}&$top={limit}&$skip={skip}')
         response.raise_for_status()
-        return response.json()
+        self._projects_cache[(limit, skip)] = response.json()
+        return self._projects_cache[(limit, skip)]
 
-    async def get_project_issue_count(self, client_session: aiohttp.ClientSession, project: dict[str, str], export_items: list[str]):
+    def invalidate_projects(self) -> None:
+        """Clear the cached projects so the next get_projects call fetches them again."""
+        self._projects_cache.clear()
+
+    async def get_project_issue_count(self, project: dict[str, str], export_items: list[str]):
         """
         Get the total number of issues for a project.
         Args:
-            client_session (aiohttp.ClientSession): session instance.
             project (dict[str, str]): Project dictionary with id and name.
             export_items (list[str]): List of items to export.
         Returns:
             int: Number of issues.
         """
-
+        key = frozenset(export_items)
         payload = {
-            'query': f'#{{{project.get('name')}}} {self._parse_query(export_items)}',  # todo - allow custom query along with this
+            'query': f'#{{{project.get('name')}}} {_parse_query(key)}',  # todo - allow custom query along with this
         }
         
-        async with client_session.post(f'{self.base_url}/api/issuesGetter/count?fields=count', json=payload, headers=self.headers) as response:
-            results = await self._session_json_response(response) 
-            return results.get('count', None)            
+        results = await self._request_with_retry('POST', self._url_count, json=payload)
+        return results.get('count', None)
 
-    async def get_issues(self, client_session: aiohttp.ClientSession, project: dict[str, str], export_items: list[str], limit: int = 100, skip: int = 0) -> list:
+    async def get_issues(self, project: dict[str, str], export_items: list[str], limit: int = 100, skip: int = 0) -> list:
         """
         Get issues for a specific project.
         Args:
-            client_session (aiohttp.ClientSession): session instance.
             project (dict[str, str]): Project dictionary with id and name.
             export_items (list[str]): List of items to export.
             limit (int): Number of issues to return.
@@ -111,15 +167,57 @@ class YouTrackClient:
         Returns:
             list: List of issues is json.
         """
-        params = {
-            'query': f'#{{{project.get('name')}}} {self._parse_query(export_items)}',  # todo - allow custom query along with this
-            'fields': self._parse_fields_from_export_items(export_items),
-            '$skip': skip,
-            '$top': limit,
-        }
+        # the query string is quoted once per project and export items, and marked as encoded so aiohttp doesn't requote it
+        query_string = _quoted_issues_query(project.get('name'), frozenset(export_items))
+        url = URL(f'{self._url_issues}?{query_string}&$skip={skip}&$top={limit}', encoded=True)
 
-        async with client_session.get(f'{self.base_url}/api/issues', params=params, headers=self.headers, timeout=15) as response:
-            return await self._session_json_response(response)
+        return await self._request_with_retry('GET', url, timeout=15)
+
+    async def iter_issues(self, project: dict[str, str], export_items: list[str], page_size: int = 100, concurrency: int = 8, total: Optional[int] = None) -> AsyncIterator[tuple[int, list]]:
+        """
+        Iterate all issues pages for a specific project, fetching the pages concurrently and yielding each page as it completes.
+        Args:
+            project (dict[str, str]): Project dictionary with id and name.
+            export_items (list[str]): List of items to export.
+            page_size (int): Number of issues to return per page.
+            concurrency (int): Maximum number of pages fetched at the same time.
+            total (Optional[int]): Known issues count, fetched from the API when not given.
+        Yields:
+            tuple[int, list]: Page offset ($skip) and the list of issues in json, in completion order.
+        """
+        key = frozenset(export_items)
+        if total is None:
+            total = await self.get_project_issue_count(project, key)
+
+        if not total or total < 0:
+            return
+
+        skips = iter(range(0, total, page_size))
+        pending: set[asyncio.Task] = set()
+        page_skips: dict[asyncio.Task, int] = {}
+
+        def schedule_next_page() -> None:
+            skip = next(skips, None)
+            if skip is not None:
+                task = asyncio.create_task(self.get_issues(project, key, limit=page_size, skip=skip))
+                page_skips[task] = skip
+                pending.add(task)
+
+        for _ in range(concurrency):
+            schedule_next_page()
+
+        try:
+            # consume pages as they complete, so later pages download while earlier ones are handled,
+            # and only keep `concurrency` pages in flight so finished pages can't pile up in memory
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for page in done:
+                    schedule_next_page()
+                    yield page_skips.pop(page), page.result()
+        finally:
+            # stop fetching the remaining pages when the caller stops iterating
+            for task in pending:
+                task.cancel()
 
     def get_issue_attachment(self, attachment: dict):
         """
@@ -129,64 +227,129 @@ class YouTrackClient:
         Returns:
             Response content for the attachment file.
         """
-        url = attachment.get('url')
-        if not url.startswith('http'):
-            url = self.base_url.rstrip('/') + '/' + url.lstrip('/')
-
-        response = self.session.get(url, timeout=30)
+        response = self.session.get(self._attachment_url(attachment), timeout=30)
         response.raise_for_status()
         return response.content
 
-    @staticmethod
-    async def _session_json_response(response):
+    async def download_attachment(self, attachment: dict, dest_path: str) -> None:
         """
-        Parse the client_session response.
+        Stream an issue attachment to a file in chunks, without holding the whole file in memory.
         Args:
-            response: aiohttp.ClientSession response instance.
+            attachment (dict): A issue attachment dictionary.
+            dest_path (str): Path of the file to write the attachment to.
+        """
+        async with self._aio.get(self._attachment_url(attachment), timeout=aiohttp.ClientTimeout(total=300)) as response:
+            response.raise_for_status()
+            async with aiofiles.open(dest_path, 'wb') as f:
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    await f.write(chunk)
+
+    def _attachment_url(self, attachment: dict) -> str:
+        """
+        Get the absolute url of an attachment.
+        Args:
+            attachment (dict): A issue attachment dictionary.
         Returns:
-            Response from YouTrack API.
+            str: Attachment url.
         """
-        response.raise_for_status()
-        return await response.json()       
+        url = attachment.get('url')
+        if not url.startswith('http'):
+            url = self.base_url.rstrip('/') + '/' + url.lstrip('/')
+        return url
 
-    @staticmethod
-    def _parse_query(export_items: list[str]) -> str:
+    async def _request_with_retry(self, method: str, url: str, **kwargs):
         """
-        Based on the export items, create the query string.
+        Send an async session request, retrying rate limited and unavailable responses with exponential backoff.
         Args:
-            export_items (list[str]): List of export items.
+            method (str): HTTP method.
+            url (str): Request url.
+            **kwargs: Extra arguments for the async session request.
         Returns:
-            str: Query string.
+            Response from YouTrack API.
         """
-        query = []
+        for attempt in range(self.__retry_attempts):
+            async with self._aio.request(method, url, **kwargs) as response:
+                if response.status not in self.__retry_statuses or attempt == self.__retry_attempts - 1:
+                    return await self._session_json_response(response)
 
-        if 'Unresolved Issues' in export_items:
-            query.append('#Unresolved')
-        if 'Resolved Issues' in export_items:
-            query.append('#Resolved')
+                # honor the Retry-After seconds when given
+                try:
+                    delay = float(response.headers.get('Retry-After', 2 ** attempt))
+                except ValueError:
+                    delay = 2 ** attempt
 
-        return ' '.join(query)
+            # sleep after leaving the block so the pooled connection is released while waiting,
+            # with jitter so concurrent pages don't retry together
+            await asyncio.sleep(delay + random.random())
 
     @staticmethod
-    def _parse_fields_from_export_items(export_items: list[str]) -> str:
+    async def _session_json_response(response):
         """
-        Set the fields that are sent based on the export items selected.
+        Parse the async session response.
         Args:
-            export_items (list[str]): List of export items.
+            response: aiohttp.ClientSession response instance.
         Returns:
-            str: Comma delimited list of fields.
-        """
-        fields = [
-            'id,idReadable,isDraft,summary,description,created,updated,resolved',
-            'tags(id,name,color),reporter(email,fullName)',
-            'parent(id,direction,linkType(name),issues(id,idReadable,resolved)),subtasks(id,direction,linkType(name),issues(id,idReadable,resolved))',
-            'links(id,direction,linkType(name),issues(id,idReadable,resolved))',
-            'customFields(id,name,value(id,name,presentation,text))'
-        ]
-
-        if 'Comments' in export_items:
-            fields.append('comments(id,author(login,name),text,created,updated)')
-        if 'Attachments' in export_items:
-            fields.append('attachments(id,name,url,created,author(login,name))')
-
-        return ','.join(fields)
+            Response from YouTrack API.
+        """
+        response.raise_for_status()
+        return orjson.loads(await response.read())
+
+
+@functools.lru_cache(maxsize=16)
+def _parse_query(export_items: frozenset[str]) -> str:
+    """
+    Based on the export items, create the query string.
+    Args:
+        export_items (frozenset[str]): Set of export items.
+    Returns:
+        str: Query string.
+    """
+    query = []
+
+    if 'Unresolved Issues' in export_items:
+        query.append('#Unresolved')
+    if 'Resolved Issues' in export_items:
+        query.append('#Resolved')
+
+    return ' '.join(query)
+
+
+@functools.lru_cache(maxsize=16)
+def _parse_fields_from_export_items(export_items: frozenset[str]) -> str:
+    """
+    Set the fields that are sent based on the export items selected.
+    Args:
+        export_items (frozenset[str]): Set of export items.
+    Returns:
+        str: Comma delimited list of fields.
+    """
+    fields = [
+        'id,idReadable,isDraft,summary,description,created,updated,resolved',
+        'tags(id,name,color),reporter(email,fullName)',
+        'parent(id,direction,linkType(name),issues(id,idReadable,resolved)),subtasks(id,direction,linkType(name),issues(id,idReadable,resolved))',
+        'links(id,direction,linkType(name),issues(id,idReadable,resolved))',
+        'customFields(id,name,value(id,name,presentation,text))'
+    ]
+
+    if 'Comments' in export_items:
+        fields.append('comments(id,author(login,name),text,created,updated)')
+    if 'Attachments' in export_items:
+        fields.append('attachments(id,name,url,created,author(login,name))')
+
+    return ','.join(fields)
+
+
+@functools.lru_cache(maxsize=64)
+def _quoted_issues_query(project_name: str, export_items: frozenset[str]) -> str:
+    """
+    Build the url quoted query and fields parameters of the issues request.
+    Args:
+        project_name (str): Project name.
+        export_items (frozenset[str]): Set of export items.
+    Returns:
+        str: Quoted query string without the paging parameters.
+    """
+    query = urllib.parse.quote(f'#{{{project_name}}} {_parse_query(export_items)}', safe='')  # todo - allow custom query along with this
+    fields = urllib.parse.quote(_parse_fields_from_export_items(export_items), safe=',()')
+
+    return f'query={query}&fields={fields}'
@@ -8,6 +8,7 @@ from pathlib import Path
 from typing import Optional
 
 import questionary
+from dotenv import dotenv_values
 from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
@@ -19,6 +20,7 @@ class ConfigManager:
     """Manages configuration for YouTrack client."""
     base_url: Optional[str] = None
     token: Optional[str] = None
+    _loaded: bool = False
 
     def __init__(self, env_file: str = '.env'):
         """
@@ -30,15 +32,15 @@ class ConfigManager:
         self._load_env_file()
 
     def _load_env_file(self):
-        """Load environment variables from .env file."""
+        """Load environment variables from .env file, only once per process."""
+        if ConfigManager._loaded:
+            return
+
         if self.env_file.exists():
             console.print('Loading environment configuration...', style='dim')
-            with open(self.env_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#') and '=' in line:
-                        key, value = line.split('=', 1)
-                        os.environ[key.strip()] = value.strip()
+            os.environ.update({key: value for key, value in dotenv_values(self.env_file).items() if value is not None})
+
+        ConfigManager._loaded = True
 
     def _save_env_file(self):
         """Save credentials to .env file."""
@@ -2,12 +2,11 @@
 Export management for the list of projects and items for each project.
 """
 import asyncio
-import json
 import os
 import shutil
 from datetime import datetime
 
-import aiohttp
+import orjson
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn, TaskID
 from slugify import slugify
@@ -19,42 +18,52 @@ console = Console()
 
 
 class Export:
-    __client_session: aiohttp.ClientSession = None
     __export_folder: str = 'exports'
     __issues_folder: str = 'issues'
     __attachments_folder: str = 'attachments'
     __metadata_filename: str = 'metadata.json'
     __batch_size: int = 100
+    __json_options: int = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
     __items_per_page: int = 50
-    __polling: dict[str, int] = {
-        'max_attempts': 10,
-        'delay': 2  # wait time for the next endpoint call
+    __concurrency: int = 8  # maximum number of simultaneous API requests
+    __attachments_concurrency: int = 8  # number of attachment download workers
+    __attachments_queue_size: int = 256
+    __attachments_max_downloads: int = 32  # simultaneous attachment downloads across all projects
+    __polling: dict[str, float] = {
+        'base_delay': 0.3,  # wait time before the second endpoint call, grows by backoff_factor each attempt
+        'backoff_factor': 1.5,
+        'max_delay': 8,
+        'max_wait': 30  # total wait time budget before giving up
     }
 
-    def __init__(self, client: YouTrackClient, projects: list[str], export_items: list[str]) -> None:
+    def __init__(self, client: YouTrackClient, projects: list[dict[str, str]], export_items: list[str]) -> None:
         """
         Initialize the Export class.
         Args:
             client (YouTrackClient): YouTrackClient instance.
-            projects (list[str]): list of project names concatenated with ids.
+            projects (list[dict[str, str]]): list of Project dictionaries with id and name.
             export_items (list[str]): list of export items.
         """
         self.client = client
-        self.projects: list[dict[str, str]] = self._parse_projects(projects)
-        self.export_items = export_items
+        # slugify the project names once, they are used for the project folders
+        self.projects: list[dict[str, str]] = [{**project, 'slug': slugify(project.get('name'))} for project in projects]
+        # a set for constant time membership checks, the client also keys its cached query strings on it
+        self.export_items: frozenset[str] = frozenset(export_items)
+        self.__export_attachments: bool = 'Attachments' in self.export_items
+        self.__attachments_semaphore = asyncio.Semaphore(self.__attachments_max_downloads)
         asyncio.run(self.export())
 
     async def export(self) -> None:
         """Start the async process for all projects and export items."""
         print()
-        console.print(f'Processing export items ({', '.join(self.export_items)}) for [green]{len(self.projects)}[/green] project(s)...')
+        console.print(f'Processing export items ({', '.join(sorted(self.export_items))}) for [green]{len(self.projects)}[/green] project(s)...')
 
         # Make sure the export folder exists.
-        if not os.path.exists(self.__export_folder):
-            os.makedirs(self.__export_folder)
+        os.makedirs(self.__export_folder, exist_ok=True)
 
         # Loop through each project and display a progress task for each.
-        async with aiohttp.ClientSession() as self.__client_session:
+        # the client shares one pooled session across all projects and pages
+        async with self.client:
             with Progress(
                     SpinnerColumn(),
                     TextColumn('{task.fields[project]}'),
@@ -70,14 +79,31 @@ class Export:
                     try:
                         task = progress.add_task('Starting export...', start=False, project=project.get('name'), total=0)
 
-                        tasks.append(self._initiate_export(project, progress, task))
+                        tasks.append(asyncio.create_task(self._initiate_export(project, progress, task)))
                     except Exception as e:
                         console.print(f'Error exporting {project.get('name')}: {e}', style='red')
                         break
 
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        console.print('Export Complete!', style='bold green')
+                # report each project as soon as it finishes rather than once the slowest one is done
+                failed = 0
+                try:
+                    for finished in asyncio.as_completed(tasks):
+                        try:
+                            await finished
+                        except Exception as e:
+                            failed += 1
+                            console.print(f'Project failed: {e}', style='red')
+                except asyncio.CancelledError:
+                    # Ctrl-C cancels the export, stop the in-flight requests right away instead of waiting on their timeouts
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    raise
+
+        if failed:
+            console.print(f'Export finished with {failed} failed project(s).', style='bold red')
+        else:
+            console.print('Export Complete!', style='bold green')
 
     async def _initiate_export(self, project: dict[str, str], progress: Progress, task: TaskID) -> TaskID:
         """
@@ -86,6 +112,8 @@ class Export:
             project (dict[str, str]): Project dictionary with id and name.
             progress (Progress): Progress instance.
             task (TaskID): TaskID instance.
+        Raises:
+            ExportError: If the project export fails.
         """
         progress.start_task(task)
 
@@ -100,13 +128,14 @@ class Export:
             # start fetching the exportable data
             export_count = 0
             if issues_total is not None and issues_total > 0:
-                export_count = await self._export_project(project, progress, task)
+                export_count = await self._export_project(project, issues_total, progress, task)
 
             # export has finished
             if export_count >= issues_total:
                 progress.update(task, description='[green]Complete![/green]')
         except Exception as e:
             progress.update(task, description=f'[red]Error exporting: {e}[/red]')
+            raise ExportError(f'{project.get('name')}: {e}')
         finally:
             progress.stop_task(task)
 
@@ -126,8 +155,10 @@ class Export:
         try:
             progress.update(task, description='Fetching issues count...')
             # if the issues total is -1, the API is loading, so we need to wait for the count to be ready
-            for attempt in range(1, self.__polling['max_attempts'] + 1):
-                issues_total = await self.client.get_project_issue_count(self.__client_session, project, self.export_items)
+            waited = 0
+            attempt = 0
+            while True:
+                issues_total = await self.client.get_project_issue_count(project, self.export_items)
                 # if the return is None, the count does not exists
                 if issues_total == None:
                     return 0
@@ -136,149 +167,170 @@ class Export:
                     progress.update(task, description=f'Issues count complete.', total=issues_total, completed=0)
 
                     return issues_total
-                progress.update(task, description=f'Loading issues count...', advance=1, total=self.__polling['max_attempts'])
-                await asyncio.sleep(self.__polling['delay'])
+
+                # stop once the wait budget is spent
+                if waited >= self.__polling['max_wait']:
+                    break
+
+                # back off exponentially so warm projects return quickly, the last wait is trimmed to the remaining budget
+                delay = min(self.__polling['max_delay'], self.__polling['base_delay'] * self.__polling['backoff_factor'] ** attempt, self.__polling['max_wait'] - waited)
+                await asyncio.sleep(delay)
+                waited += delay
+                attempt += 1
+                progress.update(task, description=f'Loading issues count...', completed=round(waited), total=self.__polling['max_wait'])
 
             raise Exception('API did not return a valid issues count.')
         except Exception as e:
             raise ExportError(f'Failed to fetch issues count. {e}')
 
-    async def _export_project(self, project: dict[str, str], progress: Progress, task: TaskID) -> int:
+    async def _export_project(self, project: dict[str, str], issues_total: int, progress: Progress, task: TaskID) -> int:
         """
         Asynchronously export the selected project with progress.
         Args:
             project (dict[str, str]): Project dictionary with id and name.
+            issues_total (int): Total number of issues to export.
             progress (Progress): Progress instance.
             task (TaskID): TaskID instance.
         """
         progress.update(task, description='Exporting issues...')
 
         parsed_issues: int = 0
-        counts: dict[str, int] = {
-            'resolved': 0,
-            'unresolved': 0,
-            'attachments': 0,
-        }
-        batch: int = 1
+        resolved: int = 0
+        attachments: int = 0
 
-        # remove project issues directory in order to overwrite all batch files
-        project_issues_folder = os.path.join(self.__get_project_folder(project, False), self.__issues_folder)
-        if os.path.exists(project_issues_folder):
-            try:
-                shutil.rmtree(project_issues_folder)
-            except Exception as e:
-                raise ExportError(f'Failed to remove current project folder. {e}')
+        # resolve the project folders once for all the issues
+        project_folder = self.__get_project_folder(project)
+        issues_folder = os.path.join(project_folder, self.__issues_folder)
+        attachments_folder = os.path.join(project_folder, self.__attachments_folder)
+        issue_attachments_folders: dict[str, str] = {}
 
-        export_attachments = 'Attachments' in self.export_items
+        # remove project issues directory in order to overwrite all batch files
+        try:
+            shutil.rmtree(issues_folder)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            raise ExportError(f'Failed to remove current project folder. {e}')
+        os.makedirs(issues_folder, exist_ok=True)
 
-        while True:
-            try:
-                issues = await self.client.get_issues(self.__client_session, project, self.export_items, skip=parsed_issues)
+        # attachments are queued while issues are saved and downloaded by the workers in the meantime
+        attachments_queue: asyncio.Queue = asyncio.Queue(maxsize=self.__attachments_queue_size)
+        attachments_errors: list[ExportError] = []
+        workers: list[asyncio.Task] = []
+        if self.__export_attachments:
+            workers = [asyncio.create_task(self._download_attachments_worker(attachments_queue, attachments_errors)) for _ in range(self.__attachments_concurrency)]
 
-                # stop when the issues and batch list is empty
-                if not issues:
-                    break
-
-                # loop through each issue and save
+        try:
+            # pages are fetched a batch at a time and arrive in completion order
+            async for skip, issues in self.client.iter_issues(project, self.export_items, page_size=self.__batch_size, concurrency=self.__concurrency, total=issues_total):
                 for issue in issues:
-                    # increment based on resolved field
+                    # count the resolved issues, the unresolved ones are the remainder
                     if issue.get('resolved', False):
-                        counts['resolved'] += 1
-                    else:
-                        counts['unresolved'] += 1
+                        resolved += 1
 
-                    self._save_issue_to_disk(project, issue, batch)
+                    # queue issue attachments, if applicable
+                    if self.__export_attachments:
+                        await self._queue_project_attachments(attachments_folder, issue_attachments_folders, issue, attachments_queue)
 
-                    # save issue attachments, if applicable
-                    if export_attachments:
-                        counts['attachments'] += self._save_project_attachments(project, issue)
+                parsed_issues += len(issues)
 
-                    parsed_issues += 1
-                    progress.update(task, advance=1)
+                # advance the progress once per page rather than per issue, repainting is costly
+                progress.update(task, advance=len(issues))
 
-                    if parsed_issues % self.__batch_size == 0:
-                        batch += 1
-            except Exception as e:
-                raise ExportError(f'Failed to export issues. {e}')
+                # number the batch file by the page offset so its issues are the same whatever order the pages arrive in
+                await self._flush_batch(issues_folder, issues, skip // self.__batch_size + 1)
 
-        self._save_project_metadata(project, counts)
+            # stop the workers once the queued attachments are downloaded
+            for _ in workers:
+                await attachments_queue.put(None)
+            attachments = sum(await asyncio.gather(*workers))
+        except Exception as e:
+            raise ExportError(f'Failed to export issues. {e}')
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+        if attachments_errors:
+            raise attachments_errors[0]
+
+        counts: dict[str, int] = {
+            'resolved': resolved,
+            'unresolved': parsed_issues - resolved,
+            'attachments': attachments,
+        }
+        await self._save_project_metadata(project_folder, counts)
 
         return parsed_issues
 
-    def _save_issue_to_disk(self, project: dict[str, str], issue: dict, batch: int = 1) -> None:
+    async def _flush_batch(self, issues_folder: str, issues: list[dict], batch: int) -> None:
         """
-        Append and dump the issue to the batch file in the project folder.
+        Dump the buffered issues to the batch file in the project issues folder with a single write in a worker thread, then clear the buffer.
         Args:
-            project (dict[str, str]): Project dictionary with id and name.
-            issues (dict): Issues list for the batch.
+            issues_folder (str): Project issues folder path.
+            issues (list[dict]): Issues list for the batch.
             batch (int): Current batch number
         """
 
-        issues_file = os.path.join(self.__get_project_folder(project), self.__issues_folder, f'issues_batch_{batch}.json')
+        issues_file = os.path.join(issues_folder, f'issues_batch_{batch}.json')
         try:
-            os.makedirs(os.path.dirname(issues_file), exist_ok=True)
-            try:
-                # open the file if it exists, get existing data, extend that data, truncate and dump data back to the file
-                with open(issues_file, 'r+', encoding='utf-8') as f:
-                    try:
-                        data = json.load(f)
-                    except json.JSONDecodeError:
-                        data = []
-
-                    if not data:
-                        data = []
-
-                    # clear the file before dumping
-                    f.seek(0)
-                    f.truncate()
-
-                    data.append(issue)
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-            except FileNotFoundError:
-                # create and dump the data into a new file when it doesn't exist
-                with open(issues_file, 'w', encoding='utf-8') as f:
-                    json.dump([issue], f, indent=2)
+            await asyncio.to_thread(self._write_json_file, issues_file, issues)
         except Exception as e:
-            raise ExportError(f'Failed to write issue to batch file. {e}')
+            raise ExportError(f'Failed to write issues to batch file. {e}')
+
+        issues.clear()
 
-    def _save_project_attachments(self, project: dict[str, str], issue: dict) -> int:
+    async def _queue_project_attachments(self, attachments_folder: str, issue_folders: dict[str, str], issue: dict, queue: asyncio.Queue) -> None:
         """
-        Get the issue's attachments from the API and save to a file in the issue id folder of the project directory.
+        Queue the issue's attachments to be downloaded into the issue id folder of the project attachments directory.
         Args:
-            project (dict[str, str]): Project dictionary with id and name.
+            attachments_folder (str): Project attachments folder path.
+            issue_folders (dict[str, str]): Already created issue id folders of the project, keyed by issue id.
             issue (dict): Issue dictionary
-        Returns:
-            int: downloaded attachments count.
+            queue (asyncio.Queue): Attachments queue consumed by the download workers.
         """
-        count = 0
         if not issue.get('attachments'):
-            return count
+            return
 
         issue_id = issue.get('idReadable')
-        attachments_folder = os.path.join(self.__get_project_folder(project), self.__attachments_folder, issue_id)
-        os.makedirs(attachments_folder, exist_ok=True)
+        issue_folder = issue_folders.get(issue_id)
+        if issue_folder is None:
+            issue_folder = issue_folders[issue_id] = os.path.join(attachments_folder, issue_id)
+            await asyncio.to_thread(os.makedirs, issue_folder, exist_ok=True)
 
-        # loop through each attachment and fetch and save the url content from the client
         for attachment in issue.get('attachments'):
-            try:
-                content = self.client.get_issue_attachment(attachment)
-                # pluck the filename and extension so the file name can be trimmed if long
-                filename, extension = os.path.splitext(attachment.get('name'))
-                file_path = os.path.join(attachments_folder, f'{attachment.get('id')}_{filename[:100]}.{extension}')
-                with open(file_path, 'wb') as f:
-                    f.write(content)
+            # pluck the filename and extension so the file name can be trimmed if long, splitext keeps the dot on the extension
+            filename, extension = os.path.splitext(attachment['name'])
+            file_path = os.path.join(issue_folder, f'{attachment['id']}_{filename[:100]}{extension}')
+            await queue.put((file_path, issue_id, attachment))
 
+    async def _download_attachments_worker(self, queue: asyncio.Queue, errors: list[ExportError]) -> int:
+        """
+        Download the queued attachments until the stop sentinel (None) is received.
+        Args:
+            queue (asyncio.Queue): Queue of (file path, issue id, attachment) items.
+            errors (list[ExportError]): Shared list collecting the failed downloads.
+        Returns:
+            int: downloaded attachments count.
+        """
+        count = 0
+        while (item := await queue.get()) is not None:
+            file_path, issue_id, attachment = item
+            try:
+                # stream the attachment url content from the client straight to disk
+                async with self.__attachments_semaphore:
+                    await self.client.download_attachment(attachment, file_path)
                 count += 1
             except Exception as e:
-                raise ExportError(f'Failed to download attachment {attachment.get('name')} for issue {issue_id}. {e}')
+                # keep consuming so the queue never blocks the issues loop, the error is raised once all workers finish
+                errors.append(ExportError(f'Failed to download attachment {attachment.get('name')} for issue {issue_id}. {e}'))
 
         return count
 
-    def _save_project_metadata(self, project: dict[str, str], counts: dict[str, int]) -> None:
+    async def _save_project_metadata(self, project_folder: str, counts: dict[str, int]) -> None:
         """
         Save a file to the project folder with details about the export.
         Args:
-            project (dict[str, str]): Project dictionary with id and name.
+            project_folder (str): Project folder path.
             counts (dict[str, int]): Dictionary containing counts.
         """
 
@@ -293,47 +345,33 @@ class Export:
             'total_attachments': counts['attachments'],
         }
 
-        metadata_file = os.path.join(self.__get_project_folder(project), self.__metadata_filename)
+        metadata_file = os.path.join(project_folder, self.__metadata_filename)
         try:
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, ensure_ascii=False, indent=2)
+            await asyncio.to_thread(self._write_json_file, metadata_file, metadata)
         except Exception as e:
             raise ExportError(f'Failed to write metadata file. {e}')
 
-    def __get_project_folder(self, project: dict[str, str], create: bool = True) -> str:
+    @staticmethod
+    def _write_json_file(path: str, data: dict | list) -> None:
         """
-        Create and get the export project folder full path.
+        Serialize the data and write it to the file, blocking so it should run in a worker thread.
         Args:
-            project (dict[str, str]): Project dictionary with id and name.
-            create (bool, optional): If True, create the project folder if it doesn't exist.
-        Returns:
-            str: Project folder full path.
+            path (str): File path.
+            data (dict | list): Data to serialize.
         """
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=Export.__json_options))
 
-        project_folder = os.path.join(self.__export_folder, slugify(project.get('name')))
-
-        # create the folder structure
-        if create:
-            os.makedirs(project_folder, exist_ok=True)
-
-        return project_folder
-
-    @staticmethod
-    def _parse_projects(projects: list[str]) -> list[dict[str, str]]:
+    def __get_project_folder(self, project: dict[str, str]) -> str:
         """
-        Parse the string of selected project strings names|ids into list of id, name dictionaries.
+        Create and get the export project folder full path.
         Args:
-            projects (list[str]): list of project names with ids.
+            project (dict[str, str]): Project dictionary with id and name.
         Returns:
-            list[dict[str, str]]: list of Project dictionaries with id and name.
+            str: Project folder full path.
         """
-        parsed_projects = []
 
-        for project in projects:
-            obj = {
-                'id': project.split('| ID:')[1].strip(),
-                'name': project.split('| ID:')[0].strip()
-            }
-            parsed_projects.append(obj)
+        project_folder = os.path.join(self.__export_folder, project['slug'])
+        os.makedirs(project_folder, exist_ok=True)
 
-        return parsed_projects
+        return project_folder